@@ -1,7 +1,10 @@
+import atexit
 import logging
 import logging.handlers
 import os
 import pathlib
+import queue
+import threading
 import yaml
 from telegram.ext import (
     Application,
@@ -9,7 +12,6 @@ from telegram.ext import (
     JobQueue,
     CallbackQueryHandler,
     CommandHandler,
-    MessageHandler
 )
 
 from defaults import Environ, build_configuration
@@ -17,6 +19,52 @@ from menupage import MenuPattern
 from model import CCT, CT
 from service import BugSignalService
 
+# libuv-backed event loop, when available (not supported on Windows)
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """ Rotating file handler with a buffered stream
+
+    Records are written to a buffered stream and flushed on an interval
+    by the owner instead of after every record; ERROR and above are flushed immediately.
+    """
+    def __init__(self, *args, bufferSize: int = 65536, **kwargs):
+        self.__buffer_size = bufferSize
+        super().__init__(*args, **kwargs)
+
+    def _open(self):
+        return open(self.baseFilename, self.mode,
+                    buffering=self.__buffer_size,
+                    encoding=self.encoding,
+                    errors=self.errors)
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes > 0:
+            # skip the path stat calls while the stream is below the rollover bound
+            if self.stream.tell() + len(self.format(record)) + len(self.terminator) < self.maxBytes:
+                return False
+            return not (os.path.exists(self.baseFilename) and not os.path.isfile(self.baseFilename))
+        return False
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.ERROR:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
 
 if __name__ == '__main__':
     # read configuration
@@ -29,19 +77,35 @@ if __name__ == '__main__':
         config = build_configuration({})
     # prepare and start logger
     pathlib.Path(config['logger']['filename']).parent.mkdir(parents=True, exist_ok=True)
-    handler = logging.handlers.RotatingFileHandler(config['logger']['filename'],
-                                                   mode=config['logger']['mode'],
-                                                   maxBytes=config['logger']['maxBytes'],
-                                                   backupCount=config['logger']['backupCount'],
-                                                   encoding=config['logger']['encoding'],
-                                                   delay=config['logger']['delay'],
-                                                   errors=config['logger']['errors'],
-                                                   )
-    logging.basicConfig(handlers=[handler],
+    handler = BufferedRotatingFileHandler(config['logger']['filename'],
+                                          mode=config['logger']['mode'],
+                                          maxBytes=config['logger']['maxBytes'],
+                                          backupCount=config['logger']['backupCount'],
+                                          encoding=config['logger']['encoding'],
+                                          delay=config['logger']['delay'],
+                                          errors=config['logger']['errors'],
+                                          bufferSize=config['logger']['bufferSize'],
+                                          )
+    handler.setFormatter(logging.Formatter('[%(asctime)s] [%(levelname)s] %(message)s'))
+    # enqueue records from hot paths; the queue listener thread formats and writes them.
+    # pass-through format: QueueHandler.prepare pre-formats with its own formatter,
+    # and the real layout must come from the file handler only
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    logging.basicConfig(handlers=[logging.handlers.QueueHandler(log_queue)],
                         level=config['logger']['level'],
-                        format='[%(asctime)s] [%(levelname)s] %(message)s',
-                        # datefmt='%Y-%m-%d %H:%M:%S',
+                        format='%(message)s',
                         )
+    queue_listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    queue_listener.start()
+    atexit.register(queue_listener.stop)
+
+    def _periodic_flush():
+        """ Flush the buffered log stream on an interval """
+        handler.flush()
+        timer = threading.Timer(config['logger']['flushInterval'], _periodic_flush)
+        timer.daemon = True
+        timer.start()
+    _periodic_flush()
     logger = logging.getLogger('bugSignal_Logger')
     logger.info('Logger initialized')
     if DEFAULTS_LOADED:
@@ -60,21 +124,23 @@ if __name__ == '__main__':
                    .defaults(Defaults(tzinfo=bot.timezone))
                    .build())
     assert application.job_queue is not None, f"Cannot initialize job queue"
-    # add handlers
-    application.add_handler(CommandHandler('start', bot.start))
-    application.add_handler(CommandHandler('fox', bot.fox))
-    application.add_handler(CommandHandler('zombie', bot.zombie))
-    application.add_handler(CommandHandler('check', bot.check))
-    application.add_handler(CommandHandler('state', bot.jobstate))
-    application.add_handler(CommandHandler('actualize', bot.actualize))
-    application.add_handler(CommandHandler('shutdown', bot.shutdown))
-    application.add_handler(CommandHandler('menu', bot.main_menu))
-    application.add_handler(CallbackQueryHandler(bot.main_menu, MenuPattern.MAIN))
-    application.add_handler(CallbackQueryHandler(bot.listeners_menu, MenuPattern.LISTENERS))
-    application.add_handler(CallbackQueryHandler(bot.chats_menu, MenuPattern.CHATS))
-    application.add_handler(CallbackQueryHandler(bot.subscriptions_menu, MenuPattern.SUBSCRIPTIONS))
-    application.add_handler(CallbackQueryHandler(bot.roles_menu, MenuPattern.ROLES))
-    application.add_handler(CallbackQueryHandler(bot.shutdown, MenuPattern.SHUTDOWN))
+    # add handlers in one bulk call
+    application.add_handlers([
+        CommandHandler('start', bot.start),
+        CommandHandler('fox', bot.fox),
+        CommandHandler('zombie', bot.zombie),
+        CommandHandler('check', bot.check),
+        CommandHandler('state', bot.jobstate),
+        CommandHandler('actualize', bot.actualize),
+        CommandHandler('shutdown', bot.shutdown),
+        CommandHandler('menu', bot.main_menu),
+        CallbackQueryHandler(bot.main_menu, MenuPattern.MAIN),
+        CallbackQueryHandler(bot.listeners_menu, MenuPattern.LISTENERS),
+        CallbackQueryHandler(bot.chats_menu, MenuPattern.CHATS),
+        CallbackQueryHandler(bot.subscriptions_menu, MenuPattern.SUBSCRIPTIONS),
+        CallbackQueryHandler(bot.roles_menu, MenuPattern.ROLES),
+        CallbackQueryHandler(bot.shutdown, MenuPattern.SHUTDOWN),
+    ])
 
     # add message handlers: Group policy Off required
     # application.add_handler(MessageHandler(None, bot.message))
@@ -1,3 +1,5 @@
+import contextlib
+import contextvars
 import logging
 import sqlalchemy as sa
 import sqlalchemy.orm as orm
@@ -10,7 +12,7 @@ from model import (
     ListenerTable, ListenerTableRow,
     ChatTable, ChatTableRow,
     SubscriptionTable, SubscriptionTableRow,
-    AnyTable, AnyTableRow,
+    AnyTable,
     definitions_loader,
     ChatValues,
     ListenerValues,
@@ -23,16 +25,24 @@ LISTENER: ListenerTable
 CHAT: ChatTable
 SUBSCRIPTION: SubscriptionTable
 
+# per-task cached read connection
+_CONNECTION: contextvars.ContextVar[sa.Connection | None] = contextvars.ContextVar('bugsignal_connection', default=None)
+
+# precomputed UserRole flags for roles()
+_ROLES = tuple((role.name, role.value) for role in UserRole)
+
 
 class Database:
     """ Class for BugSignal SQL connection management """
+    # reusable server-side timestamp clause
+    _NOW = sa.func.current_timestamp()
 
     def __init__(self,
                  connection_string: str,
                  schema: str | None = None,
                  *,
                  logger: logging.Logger):
-        self.__engine = sa.create_engine(connection_string)
+        self.__engine = sa.create_engine(connection_string, pool_size=20, max_overflow=10)
         self.__logger = logger
         # load table definitions for used dialect
         global LISTENER, CHAT, SUBSCRIPTION
@@ -52,26 +62,90 @@ class Database:
                 session.execute(sa.schema.CreateSchema(schema))
         metadata.create_all(self.__engine)
         LISTENER, CHAT, SUBSCRIPTION = _definitions
+        # native single round-trip upsert construct, if the dialect provides one
+        if self.__engine.dialect.name == 'postgresql':
+            # deferred import: only the active dialect module is ever loaded
+            import sqlalchemy.dialects.postgresql as psql
+            self.__upsert = psql.insert
+        else:
+            self.__upsert = None
+        # prebuild fixed-shape hot statements once; executed with bound parameters
+        self.__q_chat = sa.select(CHAT).where(CHAT.chat_id == sa.bindparam('chat_id'))
+        self.__q_listeners = (sa.select(LISTENER)
+                              .where(LISTENER.active.in_((True, sa.bindparam('active_only'))))
+                              .order_by(LISTENER.listener_id))
+        self.__q_subscribers = (sa.select(CHAT)
+                                .join(SUBSCRIPTION)
+                                .where(SUBSCRIPTION.listener_id == sa.bindparam('listener_id'),
+                                       SUBSCRIPTION.active.in_((True, sa.bindparam('active_only'))),
+                                       CHAT.active.in_((True, sa.bindparam('active_only')))))
 
     def dispose(self):
         """ Dispose registry and engine """
         self.__registry.dispose()
         self.__engine.dispose()
 
+    @contextlib.contextmanager
+    def __connect(self) -> typing.Iterator[sa.Connection]:
+        """ Yield the task-cached connection, acquiring one from the pool on first use """
+        if (conn := _CONNECTION.get()) is not None:
+            yield conn
+            return
+        with self.__engine.connect() as conn:
+            token = _CONNECTION.set(conn)
+            try:
+                yield conn
+            finally:
+                _CONNECTION.reset(token)
+
     def __insert_or_update(self, table: AnyTable, *keys: sa.ColumnExpressionArgument[bool], **values):
         """ Insert or update basic method """
+        # single round-trip upsert when the dialect supports it and keys cover the primary key
+        if self.__upsert is not None:
+            key_values = {clause.left.name: clause.right.value for clause in keys}              # type: ignore
+            if key_values.keys() == {column.name for column in table.__table__.primary_key}:    # type: ignore
+                query = (self.__upsert(table)
+                         .values(**{**values, **key_values})
+                         .on_conflict_do_update(index_elements=tuple(key_values),
+                                                set_={**{k: v for k, v in values.items() if k not in key_values},
+                                                      'updated': self._NOW})
+                         )
+                self.__logger.debug('%s', query)
+                with self.__engine.begin() as session:
+                    session.execute(query)
+                self.__logger.info('Updated data for %s: %s', table.__tablename__, values)
+                return
         query = sa.select(table).where(*keys)
-        self.__logger.debug(str(query))
+        self.__logger.debug('%s', query)
         with self.__engine.begin() as session:
             if session.execute(query).first():
-                values['updated'] = sa.func.current_timestamp()
-                query = sa.update(table).where(*keys).values(**values)
+                # fresh dict so the caller-owned values mapping stays untouched
+                query = sa.update(table).where(*keys).values(**values, updated=self._NOW)
             else:
                 query = sa.insert(table).values(**values)
-            self.__logger.debug(str(query))
+            self.__logger.debug('%s', query)
             session.execute(query)
         self.__logger.info('Updated data for %s: %s', table.__tablename__, values)
 
+    def __toggle_active(self, table: AnyTable, *keys: sa.ColumnExpressionArgument[bool], **values):
+        """ Atomically flip `active`, inserting an active row when none matched
+
+        The flip happens inside the UPDATE itself, so concurrent toggles
+        cannot overwrite each other with a stale read-back value.
+        """
+        # CASE flip instead of NOT: MSSQL has no boolean negation on a column
+        query = (sa.update(table).where(*keys)
+                 .values(active=sa.case((table.active == sa.true(), sa.false()),  # type: ignore
+                                        else_=sa.true()),
+                         updated=self._NOW))
+        self.__logger.debug('%s', query)
+        with self.__engine.begin() as session:
+            if session.execute(query).rowcount == 0:
+                query = sa.insert(table).values(**values, active=True)
+                self.__logger.debug('%s', query)
+                session.execute(query)
+        self.__logger.info('Toggled active for %s: %s', table.__tablename__, values)  # type: ignore
+
     def chats(self,
               active_only: bool = False,
               of_types: str | typing.Sequence[str] | None = None,
@@ -84,95 +158,122 @@ class Database:
         if exclude is not None:
             clauses.append(CHAT.chat_id.not_in((exclude,) if isinstance(exclude, int) else exclude))
         query = sa.select(CHAT).where(*clauses).order_by(CHAT.chat_id)
-        self.__logger.debug(str(query))
-        with self.__engine.connect() as conn:
-            return tuple(conn.execute(query).all()) # type: ignore
+        self.__logger.debug('%s', query)
+        with self.__connect() as conn:
+            return conn.execute(query).fetchall()  # type: ignore
 
     def set_chat(self, chat_id: int, **values: typing.Unpack[ChatValues]):
         """ Insert or update chat """
         self.__insert_or_update(CHAT, CHAT.chat_id == chat_id, chat_id=chat_id, **values)
 
+    def toggle_chat(self, chat_id: int):
+        """ Flip chat active state in a single statement """
+        self.__toggle_active(CHAT, CHAT.chat_id == chat_id, chat_id=chat_id)
+
     def listeners(self, active_only: bool = False) -> typing.Sequence[ListenerTableRow]:
         """ Request for listeners """
-        query = sa.select(LISTENER).where(LISTENER.active.in_((True, active_only))).order_by(LISTENER.listener_id)
-        self.__logger.debug(str(query))
-        with self.__engine.connect() as conn:
-            return tuple(conn.execute(query).all()) # type: ignore
+        self.__logger.debug('%s', self.__q_listeners)
+        with self.__connect() as conn:
+            return conn.execute(self.__q_listeners, dict(active_only=active_only)).fetchall()  # type: ignore
 
     def set_listener(self, listener_id: int, **values: typing.Unpack[ListenerValues]):
         """ Insert or update listener """
         self.__insert_or_update(LISTENER, LISTENER.listener_id == listener_id, **values)
 
+    def toggle_listener(self, listener_id: int):
+        """ Flip listener active state in a single statement """
+        self.__toggle_active(LISTENER, LISTENER.listener_id == listener_id)
+
     def subscriptions(self, chat_id: int) -> tuple[str, typing.Sequence[SubscriptionTableRow]]:
         """"""
-        with self.__engine.connect() as conn:
-            query = sa.select(CHAT.name).where(CHAT.chat_id == chat_id)
-            self.__logger.debug(str(query))
-            chat = conn.execute(query).first()
-            if chat is None:
-                return '', ()
-            query = sa.select(
-                LISTENER.name,
-                SUBSCRIPTION.subscription_id,
-                sa.case((SUBSCRIPTION.chat_id == None, chat_id),
-                        else_=SUBSCRIPTION.chat_id
-                        ).label('chat_id'),
-                LISTENER.listener_id,
-                SUBSCRIPTION.active
-            ).join(SUBSCRIPTION,
-                   onclause=sa.and_(SUBSCRIPTION.listener_id == LISTENER.listener_id,
-                                    SUBSCRIPTION.chat_id == chat_id),
-                   isouter=True,
-            ).where(
-                LISTENER.active == True
-            ).order_by(LISTENER.name)
-
-            self.__logger.debug(str(query))
-            return chat.name, tuple(conn.execute(query).all()) # type: ignore
+        # single round trip: anchor the chat name in a CTE projected onto every row
+        chat_cte = sa.select(CHAT.name.label('chat_name')).where(CHAT.chat_id == chat_id).cte()
+        query = sa.select(
+            chat_cte.c.chat_name,
+            LISTENER.name,
+            SUBSCRIPTION.subscription_id,
+            sa.case((SUBSCRIPTION.chat_id == None, chat_id),
+                    else_=SUBSCRIPTION.chat_id
+                    ).label('chat_id'),
+            LISTENER.listener_id,
+            SUBSCRIPTION.active
+        ).select_from(chat_cte
+        ).join(LISTENER,
+               onclause=LISTENER.active == True,
+               isouter=True,
+        ).join(SUBSCRIPTION,
+               onclause=sa.and_(SUBSCRIPTION.listener_id == LISTENER.listener_id,
+                                SUBSCRIPTION.chat_id == chat_id),
+               isouter=True,
+        ).order_by(LISTENER.name)
+
+        self.__logger.debug('%s', query)
+        with self.__connect() as conn:
+            rows = conn.execute(query).all()
+        if not rows:
+            return '', ()
+        return rows[0].chat_name, tuple(row for row in rows if row.listener_id is not None)  # type: ignore
 
     @typing.overload
     def set_subscription(self, subscription_id: int, **values: typing.Unpack[SubscriptionValues]) -> None: ...
     @typing.overload
     def set_subscription(self, chat_id: int, listener_id: int, **values: typing.Unpack[SubscriptionValues]) -> None: ...
-    def set_subscription(self, *identifiers: typing.Tuple[int], **values: typing.Unpack[SubscriptionValues]) -> None:  # type: ignore
+    def set_subscription(self, *identifiers: int, **values: typing.Unpack[SubscriptionValues]) -> None:  # type: ignore
         """ Insert or update listener """
-        match identifiers:
-            case (int(subscription_id),):
-                self.__insert_or_update(SUBSCRIPTION, SUBSCRIPTION.subscription_id == subscription_id, **values)
-            case (int(chat_id), int(listener_id)):
-                self.__insert_or_update(SUBSCRIPTION,
-                                        SUBSCRIPTION.chat_id == chat_id,
-                                        SUBSCRIPTION.listener_id == listener_id,
-                                        chat_id=chat_id,
-                                        listener_id=listener_id,
-                                        **values)
+        # plain length dispatch: cheaper than structural matching on this hot path
+        if len(identifiers) == 1:
+            self.__insert_or_update(SUBSCRIPTION, SUBSCRIPTION.subscription_id == identifiers[0], **values)
+        elif len(identifiers) == 2:
+            chat_id, listener_id = identifiers
+            self.__insert_or_update(SUBSCRIPTION,
+                                    SUBSCRIPTION.chat_id == chat_id,
+                                    SUBSCRIPTION.listener_id == listener_id,
+                                    chat_id=chat_id,
+                                    listener_id=listener_id,
+                                    **values)
+
+    def toggle_subscription(self, chat_id: int, listener_id: int):
+        """ Flip subscription active state, creating an active one if missing """
+        self.__toggle_active(SUBSCRIPTION,
+                             SUBSCRIPTION.chat_id == chat_id,
+                             SUBSCRIPTION.listener_id == listener_id,
+                             chat_id=chat_id,
+                             listener_id=listener_id)
 
     def subscribers(self, listener_id: int, *, active_only: bool = False) -> typing.Sequence[ChatTableRow]:
         """ Get listener subscribers """
-        query = sa.select(CHAT).join(SUBSCRIPTION).where(SUBSCRIPTION.listener_id == listener_id,
-                                                         SUBSCRIPTION.active.in_((True, active_only)),
-                                                         CHAT.active.in_((True, active_only)))
-        self.__logger.debug(str(query))
-        with self.__engine.connect() as conn:
-            return conn.execute(query).all()    # type: ignore
+        self.__logger.debug('%s', self.__q_subscribers)
+        with self.__connect() as conn:
+            return conn.execute(self.__q_subscribers,
+                                dict(listener_id=listener_id, active_only=active_only)).fetchall()  # type: ignore
+
+    def developers(self) -> typing.Sequence[int]:
+        """ Get chat ids of active private chats holding the DEVELOPER role """
+        # bitmask test pushed into SQL: rows without the role never leave the server
+        query = (sa.select(CHAT.chat_id)
+                 .where(CHAT.active == True,
+                        CHAT.type == 'private',
+                        CHAT.role.bitwise_and(UserRole.DEVELOPER.value) != 0))
+        self.__logger.debug('%s', query)
+        with self.__connect() as conn:
+            return conn.execute(query).scalars().all()
 
     def chat(self, chat_id: int) -> ChatTableRow | None:
         """ Request for specified chat info """
-        query = sa.select(CHAT).where(CHAT.chat_id == chat_id)
-        self.__logger.debug(str(query))
-        with self.__engine.connect() as conn:
-            return conn.execute(query).first()  # type: ignore
+        self.__logger.debug('%s', self.__q_chat)
+        with self.__connect() as conn:
+            return conn.execute(self.__q_chat, dict(chat_id=chat_id)).first()  # type: ignore
 
     def roles(self, chat_id: int) -> tuple[str, typing.Sequence[RowLike]]:
         # get stored user roles
         if (stored_chat := self.chat(chat_id)) is None:
             raise ValueError('Incorrect stored chat')
-        # build roles list
-        user_roles = UserRole(stored_chat.role)
+        # build roles list over the precomputed flags with plain int bit ops
+        mask: int = stored_chat.role
         return (stored_chat.name,
                 tuple(CustomTableRow(chat_id=stored_chat.chat_id,
-                                     name=role.name,
-                                     role=user_roles ^ role,
-                                     active=role in user_roles)
-                      for role in UserRole)
+                                     name=name,
+                                     role=UserRole(mask ^ value),
+                                     active=bool(mask & value))
+                      for name, value in _ROLES)
                 )
@@ -1,23 +1,26 @@
 from __future__ import annotations
 import enum
+import functools
+import json
+import sys
 import typing
-from copy import deepcopy
+from types import MappingProxyType
 
 
-# Telegram emoji
-class Emoji(enum.StrEnum):
-    ENABLED = '🟢'
-    DISABLED = '❌'
-    REJECTED = '⛔'
-    FOX = '🦊'
-    ZOMBIE = '🧟'
+# Telegram emoji: plain string constants — never iterated, so no enum machinery needed
+class Emoji:
+    ENABLED: typing.Final = '🟢'
+    DISABLED: typing.Final = '❌'
+    REJECTED: typing.Final = '⛔'
+    FOX: typing.Final = '🦊'
+    ZOMBIE: typing.Final = '🧟'
 
 
 # --------------------------------------------------------------------------------
-class Environ(enum.StrEnum):
+class Environ:
     """ Environment variables' names """
-    TELEGRAM_TOKEN = 'BUGSIGNAL_TELEGRAM_TOKEN'
-    SQL_CONNECTION_STRING = 'BUGSIGNAL_SQL_CONNECTION_STRING'
+    TELEGRAM_TOKEN: typing.Final = 'BUGSIGNAL_TELEGRAM_TOKEN'
+    SQL_CONNECTION_STRING: typing.Final = 'BUGSIGNAL_SQL_CONNECTION_STRING'
 
 # --------------------------------------------------------------------------------
 class LoggerConfig(typing.TypedDict):
@@ -30,6 +33,8 @@ class LoggerConfig(typing.TypedDict):
     delay: bool
     errors: str | None
     level: typing.Literal['CRITICAL', 'FATAL', 'ERROR', 'WARN', 'WARNING', 'INFO', 'DEBUG']
+    bufferSize: int
+    flushInterval: int | float
 
 class TimeoutConfig(typing.TypedDict):
     """ Timeout configuration """
@@ -45,6 +50,7 @@ class Configuration(typing.TypedDict):
     timeout: TimeoutConfig
     timezone: str
     sqlSchema: str | None
+    maxConcurrentChecks: int
 
 ANY_CONFIG_TYPE: typing.TypeAlias = Configuration | LoggerConfig | TimeoutConfig
 
@@ -59,6 +65,8 @@ DEFAULT = Configuration(
         delay=False,
         errors=None,
         level='DEBUG',
+        bufferSize=65536,
+        flushInterval=30,
     ),
     timeout=TimeoutConfig(
         common=300,
@@ -69,21 +77,31 @@ DEFAULT = Configuration(
     ),
     timezone='UTC',
     sqlSchema='bugsignal',
+    maxConcurrentChecks=8,
 )
 
+def __update_configuration[T: ANY_CONFIG_TYPE](df: T, cf: typing.Mapping) -> T:
+    # explicit dict merge: atomic leaves are taken by identity, only mappings recurse
+    _config = {}
+    for k, v in df.items():
+        if isinstance(v, typing.Mapping):
+            _config[k] = __update_configuration(v, cf[k] if isinstance(cf.get(k), typing.Mapping) else {})
+        else:
+            _config[k] = cf[k] if k in cf else v
+    return _config  # type: ignore
+
+@functools.lru_cache(maxsize=8)
+def __cached_configuration(key: str) -> Configuration:
+    _config = __update_configuration(DEFAULT, json.loads(key))
+    # expose a read-only view: the configuration is never mutated after startup
+    return typing.cast(Configuration,
+                       MappingProxyType({k: MappingProxyType(v) if isinstance(v, dict) else v
+                                         for k, v in _config.items()}))
+
 def build_configuration(cf: typing.Mapping[typing.Any, typing.Any]) -> Configuration:
     """ Update default configuration """
-    def __update_configuration[T: ANY_CONFIG_TYPE](df: T, cf: typing.Mapping) -> T:
-        _config = deepcopy(df)
-        for k, v in _config.items():
-            if k not in cf:
-                continue
-            elif isinstance(v, typing.Mapping):
-                _config[k] = __update_configuration(_config[k], cf[k])
-            else:
-                _config[k] = cf[k]
-        return _config
-    return __update_configuration(DEFAULT, cf)
+    # the built mapping is immutable, so identical inputs may share one cached result
+    return __cached_configuration(json.dumps(cf, sort_keys=True, default=str))
 
 
 # --------------------------------------------------------------------------------
@@ -119,3 +137,9 @@ class Notification:
     ERROR_LISTENER = 'Listener %s [%s] caused an exception [%s]: %s\n%s'
     ERROR_TRACEBACK = '[%s]: %s\n%s'
     ERROR_NOT_SENT_TRACEBACK = 'Message not sent [%s]: %s\n%s'
+
+# intern notification templates so repeated %-formatting hits pointer-equality fast paths
+for _key, _value in vars(Notification).items():
+    if isinstance(_value, str) and not _key.startswith('__'):
+        setattr(Notification, _key, sys.intern(_value))
+del _key, _value
@@ -1,10 +1,25 @@
 from __future__ import annotations
 import datetime as dt
+import os
 import pathlib
-import sqlalchemy as sa
+import stat as statmod
 import typing
-from collections import defaultdict
-from croniter import croniter
+from collections import deque
+
+# filesystem notifications backend: optional, polling remains the fallback
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    class _FileSystemEvents(FileSystemEventHandler):
+        """ Buffer raw event paths; the cron tick decides what they mean """
+        def __init__(self, buffer: deque[str]) -> None:
+            self.__buffer = buffer
+
+        def on_any_event(self, event) -> None:
+            self.__buffer.append(event.src_path)
+except ImportError:
+    Observer = None
 
 
 # ============================ Exceptions definition ===========================
@@ -39,30 +54,52 @@ class ListenerFactory:
     @typing.overload
     def __new__[L: Listener, **P](cls, ltype: typing.Callable[P, L]) -> typing.Callable[P, L]: ...
     def __new__[L: Listener, **P](cls, ltype: typing.Literal['FileSystemListener', 'SQLListener'] | typing.Callable[P, L]) -> ...:
-        match ltype:
-            case 'FileSystemListener':
-                return FileSystemListener
-            case 'SQLListener':
-                return SQLListener
-            case _:
-                return ltype
+        # O(1) dict dispatch instead of a sequential match ladder
+        return _LISTENER_TYPES.get(ltype, ltype) if isinstance(ltype, str) else ltype
 
 
 # ============================ Listeners definition ============================
+# hoisted bindings for hot check() loops
+_now = dt.datetime.now
+# shared result for no-update ticks: don't allocate a fresh empty tuple per check
+_EMPTY: tuple[str, ...] = ()
+# engines shared between SQL listeners with the same connection string: (engine, refcount)
+_ENGINES: dict[str, list] = {}
+# one compiled-statement cache for all listener engines
+_SQL_COMPILE_CACHE: dict = {}
+
+def _format_timestamp(ts: dt.datetime) -> str:
+    """ Fixed dd.mm.YYYY HH:MM:SS rendering without strftime's per-call format parsing """
+    return f'{ts.day:02d}.{ts.month:02d}.{ts.year:04d} {ts.hour:02d}:{ts.minute:02d}:{ts.second:02d}'
+
+
 class CronSchedule:
+    __slots__ = ('__cron', '__tzinfo', '__next')
+
     def __init__(self, cronsting: str | None, tzinfo: dt.tzinfo):
         """ Init croniter """
+        # deferred import: schedule-less listeners never touch croniter
+        from croniter import croniter
         self.__cron = croniter(cronsting) if cronsting is not None else None
         self.__tzinfo = tzinfo
+        self.__next: dt.datetime | None = None
 
     @property
     def next_t(self) -> dt.datetime | None:
         """ Provides the current expiration status and the following schedule entry [always in the future] """
-        if self.__cron is not None:
-            return self.__cron.get_next(dt.datetime, dt.datetime.now(self.__tzinfo))
+        if self.__cron is None:
+            return None
+        # recompute only once per fired tick: the cached entry stays valid until it passes
+        now = dt.datetime.now(self.__tzinfo)
+        if self.__next is None or self.__next <= now:
+            self.__next = self.__cron.get_next(dt.datetime, now)
+        return self.__next
 
 
 class BaseListener:
+    # empty: concrete listeners declare the instance attributes in their own slots
+    __slots__ = ()
+
     def __init__(self,
                  listener_id: int,
                  name: str,
@@ -87,6 +124,8 @@ class FileSystemListener(BaseListener, CronSchedule):
         takes no effect if path is a file path; \
         when `None`, the path will be tracked as a single folder \
     """
+    __slots__ = ('id', 'name', 'updated', '_state', '_dirs', '_path', '_pathobj', '_mask', '_events', '_observer')
+
     def __init__(self,
                  listener_id: int,
                  name: str,
@@ -98,78 +137,168 @@ class FileSystemListener(BaseListener, CronSchedule):
                  ):
         BaseListener.__init__(self, listener_id, name)
         CronSchedule.__init__(self, cronstring, tzinfo)
-        self._state: dict[pathlib.Path, set[str] | dt.datetime | None] = defaultdict(lambda: None)
+        # keyed by posix path string: cheaper hashing than Path objects on every check;
+        # file entries hold the raw st_mtime float, folder entries the content snapshot
+        self._state: dict[str, frozenset[str] | float | None] = {}
+        # per-folder scan cache: directory path -> (mtime, direct files, subdirectories)
+        self._dirs: dict[str, dict[str, tuple[float, frozenset[str], tuple[str, ...]]]] = {}
         self._path = path
+        # reused Path object: no per-check reconstruction for the unmasked case
+        self._pathobj = pathlib.Path(path)
         self._mask = mask
         # collect starting state
         for item in self.__filesystem_items():
-            self._state[item] = self.__default(item)
+            self._state[item.as_posix()] = self.__default(item)
+        # event-driven fast path: with watchdog available, ticks without buffered
+        # events skip the filesystem entirely
+        self._events: deque[str] = deque()
+        self._observer = None
+        if Observer is not None:
+            root = path if os.path.isdir(path) else os.path.dirname(path) or '.'
+            try:
+                observer = Observer()
+                observer.schedule(_FileSystemEvents(self._events), root, recursive=True)
+                observer.daemon = True
+                observer.start()
+                self._observer = observer
+            except OSError:
+                # e.g. out of inotify watches: keep polling
+                self._observer = None
 
     @staticmethod
-    def __folder_content(path: pathlib.Path) -> set[str]:
-        files = set()
-        for root, _, _files in path.walk():
-            files.update(root.joinpath(f).as_posix() for f in _files)
-        return files
+    def __folder_content(path: pathlib.Path,
+                         cache: dict[str, tuple[float, frozenset[str], tuple[str, ...]]] | None = None,
+                         ) -> tuple[frozenset[str] | None, dict[str, tuple[float, frozenset[str], tuple[str, ...]]]]:
+        # incremental os.scandir traversal: each directory is re-read only when its
+        # mtime differs from the cached one; unchanged subtrees reuse cached content.
+        # Mtimes are recorded before the directory is read, so later modifications
+        # always differ from the recorded value. Returns None content when the whole
+        # tree is untouched, so the caller can skip diffing entirely.
+        scanned = {}
+        rescanned = False
+        stack = [str(path)]
+        while stack:
+            _dir = stack.pop()
+            try:
+                mtime = os.stat(_dir).st_mtime
+            except OSError:
+                continue
+            if cache is not None and (record := cache.get(_dir)) is not None and record[0] == mtime:
+                scanned[_dir] = record
+                stack.extend(record[2])
+                continue
+            rescanned = True
+            files = set()
+            subdirs = []
+            try:
+                with os.scandir(_dir) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        else:
+                            files.add(entry.path)
+            except OSError:
+                continue
+            scanned[_dir] = (mtime, frozenset(files), tuple(subdirs))
+            stack.extend(subdirs)
+        if cache is not None and not rescanned and scanned.keys() == cache.keys():
+            return None, scanned
+        return frozenset().union(*(record[1] for record in scanned.values())), scanned
 
     def __filesystem_items(self) -> tuple[pathlib.Path, ...]:
         """ Collect file system items """
-        if (_path := pathlib.Path(self._path)).is_dir() and self._mask:
-            return tuple(_path.rglob(self._mask))
+        if self._mask and self._pathobj.is_dir():
+            return tuple(self._pathobj.rglob(self._mask))
         else:
-            return (_path,)
+            return (self._pathobj,)
 
-    def __default(self, item: pathlib.Path) -> dt.datetime | set[str] | None:
+    def __default(self, item: pathlib.Path) -> float | frozenset[str] | None:
         if item.is_file():
-            return dt.datetime.fromtimestamp(item.stat().st_mtime)
+            return os.path.getmtime(item)
         elif item.is_dir():
-            return self.__folder_content(item)
+            content, self._dirs[item.as_posix()] = self.__folder_content(item)
+            return content
 
     def inherit(self, other: FileSystemListener):
         """ Inherit state from other listener """
-        for item in self._state.keys():
-            if item in other._state:
-                self._state[item] = other._state[item]
+        for key in self._state.keys() & other._state.keys():
+            self._state[key] = other._state[key]
+            if key in other._dirs:
+                self._dirs[key] = other._dirs[key]
         self.updated = other.updated
+        # force a scan on the next tick: events during the handover are not observed here
+        self._events.append(self._path)
+        # the caller drops the replaced instance: stop its observer right away
+        # so it cannot keep an inotify watch and an undrained event deque alive
+        other.close()
 
     def check(self) -> tuple[str, ...]:
-        _updated = dt.datetime.now()
+        # nothing happened since the last tick: skip the walk altogether
+        if self._observer is not None and self._observer.is_alive():
+            if not (pending := len(self._events)):
+                return _EMPTY
+        else:
+            pending = 0
+        _updated = _now()
+        # raw float threshold: no datetime construction per compared file
+        threshold = self.updated.timestamp()
         messages = []
-        _items = {*self.__filesystem_items(), *self._state.keys()}
-        for item in _items:
+        _items = {item.as_posix(): item for item in self.__filesystem_items()}
+        for key in {*_items, *self._state}:
+            item = _items.get(key) or pathlib.Path(key)
+            # single stat call per item instead of separate exists/is_file/is_dir probes
+            try:
+                _stat = item.stat()
+            except OSError:
+                _stat = None
             # item was removed
-            if not item.exists():
+            if _stat is None:
                 messages.append(f'Removed: {item.absolute()}')
-                self._state.pop(item)
+                self._state.pop(key)
+                self._dirs.pop(key, None)
             # item was created
-            elif self._state[item] is None:
+            elif (_state := self._state.get(key)) is None:
                 messages.append(f'Created: {item.absolute()}')
-                self._state[item] = self.__default(item)
+                if statmod.S_ISDIR(_stat.st_mode):
+                    self._state[key], self._dirs[key] = self.__folder_content(item)
+                else:
+                    self._state[key] = _stat.st_mtime
             # item is a file
-            elif item.is_file():
-                self._state[item] = file_updated = dt.datetime.fromtimestamp(item.stat().st_mtime)
-                if file_updated > self.updated:
+            elif not statmod.S_ISDIR(_stat.st_mode):
+                self._state[key] = _stat.st_mtime
+                if _stat.st_mtime > threshold:
                     messages.append(f'File modified: {item.absolute()}')
             # item is a folder
-            elif item.is_dir():
-                assert isinstance(_state := self._state[item], set), 'Invalid state'
-                self._state[item] = content = self.__folder_content(item)
-                added = content.difference(_state)
-                removed = _state.difference(content)
+            else:
+                assert isinstance(_state, frozenset), 'Invalid state'
+                content, self._dirs[key] = self.__folder_content(item, self._dirs.get(key))
+                # untouched tree: one stat per directory, nothing to diff
+                if content is None:
+                    continue
+                self._state[key] = content
+                # only counts are reported, so one intersection replaces both difference sets
+                common = len(content & _state)
+                added = len(content) - common
+                removed = len(_state) - common
                 if not (added or removed):
                     continue
-                # build message
-                _message = f'[{item.absolute()}]\n'
+                # build message from fragments: no quadratic str += reallocation
+                _parts = [f'[{item.absolute()}]\n']
                 if added:
-                    _message += f'created {len(added)} file(s);\n'
+                    _parts.append(f'created {added} file(s);\n')
                 if removed:
-                    _message += f'removed {len(removed)} file(s);\n'
-                messages.append(_message)
+                    _parts.append(f'removed {removed} file(s);\n')
+                messages.append(''.join(_parts))
+        # consume only the events observed before this scan started
+        for _ in range(pending):
+            self._events.popleft()
         self.updated = _updated
-        return tuple(messages)
+        return tuple(messages) if messages else _EMPTY
 
     def close(self) -> None:
-        return
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
 
 
 @typing.final
@@ -189,6 +318,8 @@ class SQLListener(BaseListener, CronSchedule):
     continual : when True, update timestamp will be set as the max timestamp of the collected messages, \
         otherwise it will be set as current timestamp.
     """
+    __slots__ = ('id', 'name', 'updated', '__engine', '__connection', '_query', '_continual')
+
     def __init__(self,
                  listener_id: int,
                  name: str,
@@ -201,7 +332,20 @@ class SQLListener(BaseListener, CronSchedule):
                  ):
         BaseListener.__init__(self, listener_id, name)
         CronSchedule.__init__(self, cronstring, tzinfo)
-        self.__engine = sa.create_engine(connection, poolclass=sa.NullPool)
+        # deferred import: file-only deployments never pay the sqlalchemy load cost
+        import sqlalchemy as sa
+        # listeners polling the same database share one pooled engine instead of
+        # each holding a private connection
+        if (shared := _ENGINES.get(connection)) is None:
+            shared = _ENGINES[connection] = [sa.create_engine(connection,
+                                                              pool_size=2,
+                                                              max_overflow=4,
+                                                              pool_pre_ping=True,
+                                                              pool_recycle=1800,
+                                                              execution_options={'compiled_cache': _SQL_COMPILE_CACHE}), 0]
+        shared[1] += 1
+        self.__engine = shared[0]
+        self.__connection: str | None = connection
         self._query = sa.text(query)
         self._continual = continual
 
@@ -212,15 +356,38 @@ class SQLListener(BaseListener, CronSchedule):
 
     def check(self) -> tuple[str, ...]:
         # don't set self.updated, if SQL query failed
-        _updated = dt.datetime.now()
+        _updated = _now()
+        messages = []
+        _max_ts = None
+        # stream rows once: build messages and track the max timestamp in the same pass
         with self.__engine.connect() as conn:
-            rows = conn.execute(self._query, dict(timestamp=self.updated)).all()
-        content = tuple(f'[{row[0].strftime("%d.%m.%Y %H:%M:%S")}]\n{row[1]}' for row in rows)
+            result = conn.execution_options(yield_per=1000).execute(self._query, dict(timestamp=self.updated))
+            for row in result:
+                ts = row[0]
+                messages.append(f'[{_format_timestamp(ts)}]\n{row[1]}')
+                if _max_ts is None or ts > _max_ts:
+                    _max_ts = ts
         if not self._continual:
             self.updated = _updated
-        elif rows:
-            self.updated = max(row[0] for row in rows)
-        return content
+        elif _max_ts is not None:
+            self.updated = _max_ts
+        return tuple(messages) if messages else _EMPTY
 
     def close(self) -> None:
-        self.__engine.dispose()
+        # dispose the shared engine only when its last listener is closed;
+        # idempotent so inherit() and the actualizer may both call it
+        if self.__connection is None:
+            return
+        if (shared := _ENGINES.get(self.__connection)) is not None:
+            shared[1] -= 1
+            if shared[1] <= 0:
+                del _ENGINES[self.__connection]
+                self.__engine.dispose()
+        self.__connection = None
+
+
+# listener dispatch table for ListenerFactory
+_LISTENER_TYPES: dict[str, type] = {
+    'FileSystemListener': FileSystemListener,
+    'SQLListener': SQLListener,
+}
@@ -2,51 +2,52 @@ from __future__ import annotations
 import enum
 import math
 import typing
-from collections import namedtuple
 from telegram import InlineKeyboardMarkup, InlineKeyboardButton
+from types import MappingProxyType
 
 from defaults import Emoji
 from model import RowLike
 
 
-class MenuPattern(enum.StrEnum):
+# plain constants: these are only matched and formatted, so no enum machinery needed
+class MenuPattern:
     """ Menu pattern: will not contain `:` symbol """
-    EMPTY = ''
-    MAIN = enum.auto()
-    CHATS = enum.auto()
-    LISTENERS = enum.auto()
-    SUBSCRIPTIONS = enum.auto()
-    ROLES = enum.auto()
-    SHUTDOWN = enum.auto()
+    EMPTY: typing.Final = ''
+    MAIN: typing.Final = 'main'
+    CHATS: typing.Final = 'chats'
+    LISTENERS: typing.Final = 'listeners'
+    SUBSCRIPTIONS: typing.Final = 'subscriptions'
+    ROLES: typing.Final = 'roles'
+    SHUTDOWN: typing.Final = 'shutdown'
 
 
-class Action(enum.IntEnum):
+class Action:
     """ Action identifiers """
-    CLOSE = enum.auto()
-    MENU = enum.auto()
-    BACK = enum.auto()
-    NEXTPAGE = enum.auto()
-    PREVPAGE = enum.auto()
-    SWITCH = enum.auto()
-    CHATS = enum.auto()
-    LISTENERS = enum.auto()
-    SUBSCRIPTIONS = enum.auto()
-    ROLES = enum.auto()
-    CONFIRM = enum.auto()
-
-
-class CallbackKey(enum.StrEnum):
+    CLOSE: typing.Final = 1
+    MENU: typing.Final = 2
+    BACK: typing.Final = 3
+    NEXTPAGE: typing.Final = 4
+    PREVPAGE: typing.Final = 5
+    SWITCH: typing.Final = 6
+    CHATS: typing.Final = 7
+    LISTENERS: typing.Final = 8
+    SUBSCRIPTIONS: typing.Final = 9
+    ROLES: typing.Final = 10
+    CONFIRM: typing.Final = 11
+
+
+class CallbackKey:
     """ Callback content keys """
-    ACTION = enum.auto()
-    CHAT_ID = enum.auto()
-    LISTENER_ID = enum.auto()
-    ROLE = enum.auto()
-    ACTIVE = enum.auto()
+    ACTION: typing.Final = 'action'
+    CHAT_ID: typing.Final = 'chat_id'
+    LISTENER_ID: typing.Final = 'listener_id'
+    ROLE: typing.Final = 'role'
+    ACTIVE: typing.Final = 'active'
 
 
 class CallbackContent(typing.TypedDict):
     """ Callback content typings """
-    action: Action | None
+    action: int | None
     chat_id: typing.NotRequired[int]
     listener_id: typing.NotRequired[int]
     role: typing.NotRequired[int]
@@ -55,6 +56,12 @@ class CallbackContent(typing.TypedDict):
 
 CallbackProtocol = typing.MutableMapping[int, CallbackContent]
 
+# shared immutable payloads for the frequent action-only callbacks
+_ACTION_ONLY: dict[int | None, CallbackContent] = {
+    action: typing.cast(CallbackContent, MappingProxyType({'action': action}))
+    for action in (None, Action.CLOSE, Action.MENU, Action.BACK, Action.NEXTPAGE, Action.PREVPAGE)
+}
+
 
 class Button(enum.IntFlag):
     """ Additional buttons """
@@ -69,37 +76,55 @@ class InlineMenuPage:
     """ Inline menu instance """
     ITEMS_PER_PAGE = 4
 
-    _ItemMetadata = namedtuple('_ItemMetadata', 'action,pattern')
-
     def __init__(self,
                  pattern: str,
                  name: str,
                  *,
                  items: typing.Sequence[RowLike],
                  checkmark: bool = False,
-                 items_action: Action | typing.Sequence[Action] | None = None,
-                 items_pattern: MenuPattern | typing.Sequence[MenuPattern] | None = None,
+                 items_action: int | typing.Sequence[int] | None = None,
+                 items_pattern: str | typing.Sequence[str] | None = None,
                  additional_buttons: Button = Button.EMPTY,
                  previous: InlineMenuPage | None = None,
                  ):
         __assert_message = '`%s` must contain either one or as many values as items'
         self.__pattern = pattern
         self.name = name
+        # rebuilt-markup cache: (version, markup); bumped by items/page mutation
+        self.__version = 0
+        self.__markup_cache: tuple[int, InlineKeyboardMarkup] | None = None
         self.items = items
         self.__checkmark = checkmark
-        __items_action = (items_action if isinstance(items_action, typing.Sequence)
-                          else [items_action] * len(items))
-        assert len(__items_action) in {1, len(items)}, __assert_message % '`items_action`'
-        __items_pattern = (items_pattern if isinstance(items_pattern, typing.Sequence)
-                           else [items_pattern or pattern] * len(items))
-        assert len(__items_pattern) in {1, len(items)}, __assert_message % '`items_pattern`'
-        self.__metadata = tuple(self._ItemMetadata(action, pattern)
-                                for action, pattern in zip(__items_action, __items_pattern))
-        self.__additional_buttons = additional_buttons
+        # keep the normalized sources only; per-item metadata objects are never built
+        self.__items_action = (tuple(items_action) if isinstance(items_action, typing.Sequence)
+                               else (items_action,))
+        assert len(self.__items_action) in {1, len(items)}, __assert_message % '`items_action`'
+        self.__items_pattern = (tuple(items_pattern) if isinstance(items_pattern, typing.Sequence)
+                                else (items_pattern or pattern,))
+        assert len(self.__items_pattern) in {1, len(items)}, __assert_message % '`items_pattern`'
+        # service rows are fixed at construction: precompute their contents once
+        _service_rows: list[tuple[tuple[str, CallbackContent], ...]] = []
+        if Button.NAVIGATION in additional_buttons:
+            _service_rows.append((('<<', _ACTION_ONLY[Action.PREVPAGE]),
+                                  ('>>', _ACTION_ONLY[Action.NEXTPAGE])))
+        if Button.BACK in additional_buttons:
+            _service_rows.append((('Back', _ACTION_ONLY[Action.BACK]),))
+        if Button.CLOSE in additional_buttons:
+            _service_rows.append((('Close', _ACTION_ONLY[Action.CLOSE]),))
+        self.__service_rows = tuple(_service_rows)
         self.previous = previous
         self.__page = 0
         self.__callback_content: CallbackProtocol = {}
 
+    @property
+    def items(self) -> typing.Sequence[RowLike]:
+        return self.__items
+
+    @items.setter
+    def items(self, value: typing.Sequence[RowLike]):
+        self.__items = value
+        self.__version += 1
+
     @property
     def page(self) -> int:
         return self.__page
@@ -109,11 +134,12 @@ class InlineMenuPage:
         """ Set page preventing overflow """
         MAXPAGE = math.ceil(len(self.items) / self.ITEMS_PER_PAGE) - 1
         if value < 0:
-            self.__page = MAXPAGE
+            value = MAXPAGE
         elif value > MAXPAGE:
-            self.__page = 0
-        else:
+            value = 0
+        if value != self.__page:
             self.__page = value
+            self.__version += 1
 
     def __set_button_content(self,
                              name: str,
@@ -122,45 +148,54 @@ class InlineMenuPage:
                              ) -> InlineKeyboardButton:
         """ Create inline button and save its callback content """
         _pattern = pattern or self.__pattern
-        _button_id = max(self.__callback_content.keys() or [-1]) + 1
+        # ids are assigned sequentially from 0 after clear(), so the size is the next id
+        _button_id = len(self.__callback_content)
         self.__callback_content[_button_id] = content
         return InlineKeyboardButton(name, callback_data=f'{_pattern}:{_button_id}')
 
     @property
     def markup(self) -> InlineKeyboardMarkup:
         """ Build markup from page items with additional buttons """
+        # repeat renders of an unchanged page reuse the cached keyboard
+        if self.__markup_cache is not None and self.__markup_cache[0] == self.__version:
+            return self.__markup_cache[1]
         # build inline keyboard
         self.__callback_content.clear()
         buttons = []
         START = self.page * self.ITEMS_PER_PAGE
         END = (self.page + 1) * self.ITEMS_PER_PAGE
-        for n, (item, meta) in enumerate(zip(self.items[START:END], self.__metadata[START:END])):
-            # collect button callback content
-            _item_dict = item._asdict()
-            _content = CallbackContent(**{_param_name: _item_dict[_param_name]
-                                          for _param_name in CallbackContent.__annotations__.keys()
-                                          if _param_name in _item_dict})
-            if meta.action is not None:
-                _content['action'] = meta.action
+        _items = self.items[START:END]
+        # broadcast single values over the visible window only
+        _actions = (self.__items_action * len(_items) if len(self.__items_action) == 1
+                    else self.__items_action[START:END])
+        _patterns = (self.__items_pattern * len(_items) if len(self.__items_pattern) == 1
+                     else self.__items_pattern[START:END])
+        if _items:
+            # visible rows are homogeneous: resolve the callback keys once per render
+            _fields = _items[0]._fields
+            _row_keys = tuple(_param_name for _param_name in CallbackContent.__annotations__
+                              if _param_name in _fields)
+            _has_pattern = 'pattern' in _fields
+        for n, (item, _action, _meta_pattern) in enumerate(zip(_items, _actions, _patterns)):
+            # collect button callback content without an intermediate _asdict() copy
+            _content = CallbackContent(**{_param_name: getattr(item, _param_name)
+                                          for _param_name in _row_keys})
+            if _action is not None:
+                _content['action'] = _action
             if self.__checkmark:
                 mark = f'{(Emoji.ENABLED if _content.get(CallbackKey.ACTIVE) else Emoji.DISABLED)} '
             else:
                 mark = ''
             name = mark + (getattr(item, 'name', None) or f'Unknown {n}')
-            _pattern = _item_dict.get('pattern', meta.pattern)
+            _pattern = item.pattern if _has_pattern else _meta_pattern
             buttons.append((self.__set_button_content(name, _content, _pattern),))
 
         # append service buttons
-        if Button.NAVIGATION in self.__additional_buttons:
-            buttons.append((self.__set_button_content('<<', {'action': Action.PREVPAGE}),
-                            self.__set_button_content('>>', {'action': Action.NEXTPAGE})
-                            ))
-        if Button.BACK in self.__additional_buttons:
-            buttons.append((self.__set_button_content('Back', {'action': Action.BACK}),))
-        # add CLOSE button
-        if Button.CLOSE in self.__additional_buttons:
-            buttons.append((self.__set_button_content('Close', {'action': Action.CLOSE}),))
-        return InlineKeyboardMarkup(buttons)
+        for row in self.__service_rows:
+            buttons.append(tuple(self.__set_button_content(name, content) for name, content in row))
+        markup = InlineKeyboardMarkup(buttons)
+        self.__markup_cache = (self.__version, markup)
+        return markup
 
     def content(self, key: str) -> CallbackContent:
         """ Get button content for specified callback data """
@@ -168,6 +203,6 @@ class InlineMenuPage:
             _key = int(key[key.index(':') + 1:])
             return self.__callback_content[_key]
         except (ValueError, KeyError):
-            return CallbackContent(action=None)
+            return _ACTION_ONLY[None]
 
 class MenuError(Exception): ...
@@ -4,15 +4,11 @@ import datetime as dt
 import json
 import logging
 import os
-import pytz
 import random
-import signal
-import sqlalchemy.exc as sqlex
 import time
-import traceback
+import zoneinfo
 from contextlib import contextmanager
 from telegram import Update
-from telegram.ext import Job
 from telegram.constants import ChatType
 from telegram.error import BadRequest
 from typing import (
@@ -22,7 +18,6 @@ from typing import (
     Coroutine,
     MutableMapping,
     Sequence,
-    Unpack,
 )
 
 from database import Database
@@ -60,16 +55,38 @@ from model import (
 from __version__ import VERSION
 
 
+# static menu rows shared by every chat: the pages themselves stay per-chat
+# because they carry callback payloads and pagination state
+_MAIN_MENU_ITEMS = (CustomTableRow(name='Chats',
+                                   action=Action.CHATS,
+                                   pattern=MenuPattern.CHATS),
+                    CustomTableRow(name='Listeners',
+                                   action=Action.LISTENERS,
+                                   pattern=MenuPattern.LISTENERS),
+                    CustomTableRow(name='Subscriptions',
+                                   action=Action.SUBSCRIPTIONS,
+                                   pattern=MenuPattern.SUBSCRIPTIONS),
+                    CustomTableRow(name='Private roles',
+                                   action=Action.ROLES,
+                                   pattern=MenuPattern.ROLES),
+                    )
+_SHUTDOWN_MENU_ITEMS = (CustomTableRow(name=f'{Emoji.ENABLED} Yes',
+                                       action=Action.CONFIRM),
+                        CustomTableRow(name=f'{Emoji.DISABLED} No',
+                                       action=Action.CLOSE),
+                        )
+
+
 def checkvars[S: BugSignalService, T, **KW](
-        method: Callable[Concatenate[S, Update, CCT, KW], Coroutine[Any, Any, T]]
+        method: Callable[Concatenate[S, Update, CCT, 'ValidatedContext', KW], Coroutine[Any, Any, T]]
         ) -> Callable[[S, Update, CCT], Coroutine[Any, Any, T]]:
     """ Decorator for checking general variables """
-    def _wrapper(self: S,
-                 update: Update,
-                 context: CCT,
-                 *args: KW.args,
-                 **kwargs: KW.kwargs
-                 ) -> Coroutine[Any, Any, T]:
+    async def _wrapper(self: S,
+                       update: Update,
+                       context: CCT,
+                       *args: KW.args,
+                       **kwargs: KW.kwargs
+                       ) -> T:
         assert (user := update.effective_user) is not None, f'[checkvars] effective_user is None'
         assert (chat := update.effective_chat) is not None, f'[checkvars] effective_chat is None'
         assert (message := update.effective_message) is not None, f'[checkvars] effective_message is None'
@@ -81,20 +98,20 @@ def checkvars[S: BugSignalService, T, **KW](
             callback_data = query.data or ''
         else:
             callback_data = ''
-        kwargs.update(
-            user=user,
-            chat=chat,
-            message=message,
-            user_data=user_data,
-            chat_data=chat_data,
-            bot_data=bot_data,
-            callback_data=callback_data,
-            job_queue=job_queue,
-        )
-        return method(self, update, context, *args, **kwargs)
+        # one slotted object instead of a dict built and splatted on every update
+        ctx = ValidatedContext(user, chat, message, user_data, chat_data, bot_data,
+                               callback_data, job_queue)
+        return await method(self, update, context, ctx, *args, **kwargs)
     return _wrapper
 
 
+# templates used on every single update: bound once so the permission
+# wrapper does plain name loads instead of class attribute lookups
+_MSG_QUERY_ANSWER = Notification.MESSAGE_QUERY_ANSWER
+_MSG_REJECTED = Notification.MESSAGE_COMMAND_REJECTED
+_LOG_REJECTED = Notification.LOG_COMMAND_REJECTED
+
+
 def allowed_for(roles: UserRole, chat_admin: bool):
     """ Decorator for checking permissions
 
@@ -113,23 +130,30 @@ def allowed_for(roles: UserRole, chat_admin: bool):
             assert (message := update.effective_message) is not None, '[permission_check] effective_message is None'
             # callback answer
             if (callback_query := update.callback_query) is not None:
-                await callback_query.answer(Notification.MESSAGE_QUERY_ANSWER)
-            # get stored user role
-            user_roles = (set(UserRole(stored_chat.role))
-                          if (stored_chat := self.db.chat(user.id)) is not None
-                          else set())
-            # allowed by UserRole
-            if bool(user_roles.intersection(roles)):
-                return await method(self, update, context, *args, **kwargs)
-            # otherwise check chat permissions
-            administrators = ({_admin.user for _admin in await chat.get_administrators()}
-                              if chat.type != ChatType.PRIVATE
-                              else set())
-            if chat_admin and user in administrators and user_roles:
+                await callback_query.answer(_MSG_QUERY_ANSWER)
+            # get stored user role as a plain bitmask [TTL-cached: authorization runs on every update]
+            now = time.monotonic()
+            if (cached := self._role_cache.get(user.id)) is not None and cached[0] > now:
+                user_roles = cached[1]
+            else:
+                user_roles = stored_chat.role if (stored_chat := self.db.chat(user.id)) is not None else 0
+                self._role_cache[user.id] = (now + self._auth_ttl, user_roles)
+            # allowed by UserRole: one AND instead of flag decomposition into sets
+            if user_roles & roles:
                 return await method(self, update, context, *args, **kwargs)
+            # otherwise check chat permissions; the admin list is a Telegram API round-trip,
+            # so skip it entirely when it cannot grant access and cache it per chat otherwise
+            if chat_admin and user_roles and chat.type != ChatType.PRIVATE:
+                if (cached := self._admin_cache.get(chat.id)) is not None and cached[0] > now:
+                    administrators = cached[1]
+                else:
+                    administrators = frozenset(_admin.user.id for _admin in await chat.get_administrators())
+                    self._admin_cache[chat.id] = (now + self._auth_ttl, administrators)
+                if user.id in administrators:
+                    return await method(self, update, context, *args, **kwargs)
             # restrict command execution
-            self.logger.warning(Notification.LOG_COMMAND_REJECTED % (user.name, user.id))
-            await message.reply_text(Notification.MESSAGE_COMMAND_REJECTED % user.name)
+            self.logger.warning(_LOG_REJECTED % (user.name, user.id))
+            await message.reply_text(_MSG_REJECTED % user.name)
             return await _empty_handler(self, update, context, *args, **kwargs)
         return _wrapper
     return _permission_check
@@ -145,12 +169,24 @@ class BugSignalService:
         self.config = config
         self.__developers: tuple[int, ...] = ()
         try:
-            self.timezone = pytz.timezone(self.config['timezone'])
+            self.timezone = zoneinfo.ZoneInfo(self.config['timezone'])
         except:
-            self.timezone = pytz.UTC
+            self.timezone = dt.timezone.utc
             self.logger.warning(Notification.LOG_INCORRECT_TIMEZONE, self.config['timezone'])
         self.__actualizer_cron = CronSchedule(self.config['timeout']['actualizerCron'], self.timezone)
         self.__listeners: MutableMapping[int, Listener] = {}
+        # bound in-flight listener checks so simultaneous wakeups don't stampede
+        self.__check_bound = asyncio.Semaphore(self.config['maxConcurrentChecks'])
+        # one lock per listener id: checks mutate listener state, so a forced
+        # /check must not overlap the scheduled job for the same listener
+        self.__listener_locks: dict[int, asyncio.Lock] = {}
+        # authorization caches shared with the allowed_for decorator:
+        # stored roles and Telegram admin lists, both with a deadline per entry
+        self._auth_ttl = self.config['timeout']['common']
+        self._role_cache: dict[int, tuple[float, int]] = {}
+        self._admin_cache: dict[int, tuple[float, frozenset[int]]] = {}
+        # active private chats for /fox and /zombie: rebuilt only after chat writes
+        self.__private_users: tuple[int, ...] | None = None
 
     @contextmanager
     def run(self, *args, **kwargs):
@@ -160,78 +196,94 @@ class BugSignalService:
     # --------------------------------------------------------------------------------
     # common command handlers
     @checkvars
-    async def start(self, update: Update, context: CCT, **kwargs: Unpack[ValidatedContext]):
+    async def start(self, update: Update, context: CCT, ctx: ValidatedContext):
         """ Remember chat id """
-        self.db.set_chat(kwargs['chat'].id,
-                         name=kwargs['chat'].username or kwargs['chat'].effective_name or str(kwargs['chat'].id),
-                         type=kwargs['chat'].type)
-        await kwargs['message'].reply_text(Notification.MESSAGE_CHAT_INFORMATION_SAVED)
+        self.db.set_chat(ctx.chat.id,
+                         name=ctx.chat.username or ctx.chat.effective_name or str(ctx.chat.id),
+                         type=ctx.chat.type)
+        self.__private_users = None
+        await ctx.message.reply_text(Notification.MESSAGE_CHAT_INFORMATION_SAVED)
 
     @checkvars
     @allowed_for(UserRole.ACTIVE, chat_admin=False)
-    async def fox(self, update: Update, context: CCT, **kwargs: Unpack[ValidatedContext]):
+    async def fox(self, update: Update, context: CCT, ctx: ValidatedContext):
         """ Send fox emoji """
-        chat_id = self.__get_random_user(context.args, kwargs['user'].id)
-        self.logger.info(Notification.LOG_SENT_FROM_TO % (kwargs['user'].name, chat_id))
+        chat_id = self.__get_random_user(context.args, ctx.user.id)
+        self.logger.info(Notification.LOG_SENT_FROM_TO % (ctx.user.name, chat_id))
         await context.bot.send_message(chat_id, Emoji.FOX)
 
     @checkvars
     @allowed_for(UserRole.NECROMANCER, chat_admin=False)
-    async def zombie(self, update: Update, context: CCT, **kwargs: Unpack[ValidatedContext]):
+    async def zombie(self, update: Update, context: CCT, ctx: ValidatedContext):
         """ Send zombie emoji """
-        chat_id = self.__get_random_user(context.args, kwargs['user'].id)
-        self.logger.info(Notification.LOG_SENT_FROM_TO % (kwargs['user'].name, chat_id))
+        chat_id = self.__get_random_user(context.args, ctx.user.id)
+        self.logger.info(Notification.LOG_SENT_FROM_TO % (ctx.user.name, chat_id))
         await context.bot.send_message(chat_id, Emoji.ZOMBIE)
 
     @checkvars
     @allowed_for(UserRole.ACTIVE, chat_admin=True)
-    async def check(self, update: Update, context: CCT, **kwargs: Unpack[ValidatedContext]):
+    async def check(self, update: Update, context: CCT, ctx: ValidatedContext):
         """ Force check all listeners for updates """
-        message = await kwargs['message'].reply_text(Notification.MESSAGE_CHECK_LISTENERS)
-        _ids = set(int(arg) for arg in (context.args or ()) if arg.isdigit())
-        for listener in self.__listeners.values():
-            if _ids and listener.id not in _ids:
-                continue
-            kwargs['job_queue'].run_once(self.__check_listener,
+        message = await ctx.message.reply_text(Notification.MESSAGE_CHECK_LISTENERS)
+        _ids = frozenset(int(arg) for arg in (context.args or ()) if arg.isdigit())
+
+        def _tracked(done: asyncio.Future):
+            """ Wrap the check job so its completion resolves `done`, success or not """
+            async def _run(context: CCT):
+                try:
+                    await self.__check_listener(context)
+                finally:
+                    if not done.done():
+                        done.set_result(None)
+            return _run
+
+        loop = asyncio.get_running_loop()
+        pending: list[asyncio.Future] = []
+        # walk the requested ids when given: no full scan for a one-listener check
+        targets = (self.__listeners.values() if not _ids
+                   else tuple(listener for _id in _ids
+                              if (listener := self.__listeners.get(_id)) is not None))
+        for listener in targets:
+            done = loop.create_future()
+            pending.append(done)
+            ctx.job_queue.run_once(_tracked(done),
                                          when=0,
                                          data=JobData(listener.id),
                                          name=JobName.CHECKER,
-                                         chat_id=kwargs['chat'].id,
+                                         chat_id=ctx.chat.id,
                                          job_kwargs=MISFIRE_GRACE)
-        # await for all forced listeners done
-        started = time.monotonic()
-        while time.monotonic() - started < self.config['timeout']['common']:
-            if not any(j for j in kwargs['job_queue'].jobs() if (j.name or '').startswith(JobName.CHECKER)):
-                break
-            await asyncio.sleep(0.1)
-        else:
-            raise TimeoutError()
+        # await for all forced listeners done: wakes on the last completion
+        # instead of polling the whole job list every 100 ms
+        if pending:
+            _, unfinished = await asyncio.wait(pending, timeout=self.config['timeout']['common'])
+            if unfinished:
+                raise TimeoutError()
         await message.reply_text(Notification.MESSAGE_DONE)
 
     @checkvars
     @allowed_for(UserRole.ACTIVE, chat_admin=False)
-    async def jobstate(self, update: Update, context: CCT, **kwargs: Unpack[ValidatedContext]):
+    async def jobstate(self, update: Update, context: CCT, ctx: ValidatedContext):
         """ Get current bugSignal state """
-        def _jobformat(job: Job[CCT]):
-            """ Return formatted job schedule """
-            _args = (
-                self.__listeners.get(job.data.listener_id, job).name if isinstance(job.data, JobData) else job.name,
-                job.next_t.replace(microsecond=0) if job.next_t else None
-            )
-            return Notification.MESSAGE_JOB_STATE % (*_args,)
+        # single pass over the sorted jobs with the listener lookup hoisted
+        _get_listener = self.__listeners.get
+        _lines = []
+        for job in sorted(ctx.job_queue.jobs(), key=lambda j: j.name or ''):
+            _name = (_get_listener(job.data.listener_id, job).name
+                     if isinstance(job.data, JobData) else job.name)
+            _lines.append(Notification.MESSAGE_JOB_STATE
+                          % (_name, job.next_t.replace(microsecond=0) if job.next_t else None))
         # collect self state args
-        _jobs = sorted(kwargs['job_queue'].jobs(), key=lambda j: j.name or '')
         _args = (
             dt.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             VERSION,
-            '\n'.join(map(_jobformat, _jobs)),
+            '\n'.join(_lines),
             len(self.__listeners),
         )
-        await kwargs['message'].reply_text(Notification.MESSAGE_SELF_STATE % (*_args,))
+        await ctx.message.reply_text(Notification.MESSAGE_SELF_STATE % (*_args,))
 
     @checkvars
     @allowed_for(UserRole.MASTER | UserRole.MODERATOR, chat_admin=False)
-    async def actualize(self, update: Update, context: CCT, **kwargs: Unpack[ValidatedContext]):
+    async def actualize(self, update: Update, context: CCT, ctx: ValidatedContext):
         """ Actualize listener jobs """
         await self.__actualize(context)
         await self.jobstate(update, context)
@@ -239,26 +291,26 @@ class BugSignalService:
     # --------------------------------------------------------------------------------
     # Common inline menu
     @checkvars
-    async def __menu_refresh(self, update: Update, context: CCT, **kwargs: Unpack[ValidatedContext]):
+    async def __menu_refresh(self, update: Update, context: CCT, ctx: ValidatedContext):
         """ Refresh menu page """
-        if (menupage := kwargs['chat_data'].get('menupage')) is None:
+        if (menupage := ctx.chat_data.get('menupage')) is None:
             raise MenuError(Notification.ERROR_MENU_PAGE)
         markup = menupage.markup
-        if kwargs['message'].text == menupage.name and kwargs['message'].reply_markup == markup:
+        if ctx.message.text == menupage.name and ctx.message.reply_markup == markup:
             return
         try:
-            await kwargs['message'].edit_text(menupage.name, reply_markup=markup)
+            await ctx.message.edit_text(menupage.name, reply_markup=markup)
         except BadRequest:
-            await context.bot.send_message(kwargs['chat'].id, menupage.name, reply_markup=markup)
+            await context.bot.send_message(ctx.chat.id, menupage.name, reply_markup=markup)
 
     @checkvars
-    async def __menu_commons(self, update: Update, context: CCT, **kwargs: Unpack[ValidatedContext]):
+    async def __menu_commons(self, update: Update, context: CCT, ctx: ValidatedContext):
         """ Handle common inline menu callbacks: DO NOT USE AS DIRECT COMMAND HANDLER """
-        chat_data = kwargs['chat_data']
-        if (menupage := kwargs['chat_data'].get('menupage')) is None:
+        chat_data = ctx.chat_data
+        if (menupage := ctx.chat_data.get('menupage')) is None:
             raise MenuError(Notification.ERROR_MENU_PAGE)
         # match inline query callback
-        content = menupage.content(kwargs['callback_data'])
+        content = menupage.content(ctx.callback_data)
         match content:
             # ----------------------------------------
             # open next page
@@ -274,10 +326,10 @@ class BugSignalService:
             # close menu
             case {CallbackKey.ACTION: Action.CLOSE}:
                 chat_data.pop('menupage')
-                return await kwargs['message'].edit_text(Notification.MESSAGE_MENU_CLOSED, reply_markup=None)
+                return await ctx.message.edit_text(Notification.MESSAGE_MENU_CLOSED, reply_markup=None)
             # already opened
             case {CallbackKey.ACTION: None}:
-                return await kwargs['message'].reply_text(Notification.MESSAGE_MENU_OPENED)
+                return await ctx.message.reply_text(Notification.MESSAGE_MENU_OPENED)
             # unknown content
             case _:
                 raise MenuError(Notification.ERROR_MENU_CALLBACK)
@@ -288,38 +340,26 @@ class BugSignalService:
     # Inline main menu
     @checkvars
     @allowed_for(UserRole.MASTER | UserRole.MODERATOR | UserRole.DEVELOPER, chat_admin=True)
-    async def main_menu(self, update: Update, context: CCT, **kwargs: Unpack[ValidatedContext]):
+    async def main_menu(self, update: Update, context: CCT, ctx: ValidatedContext):
         """ Show main menu """
-        chat_data = kwargs['chat_data']
+        chat_data = ctx.chat_data
         # first or back open menu
         if (menupage := chat_data.get('menupage')) is None:
-            if kwargs['callback_data']:
+            if ctx.callback_data:
                 raise MenuError(Notification.ERROR_MENU_PAGE)
             # build menu
             menupage = InlineMenuPage(
                 pattern=MenuPattern.MAIN,
                 name='bugSignal admin panel',
-                items=(CustomTableRow(name='Chats',
-                                      action=Action.CHATS,
-                                      pattern=MenuPattern.CHATS),
-                       CustomTableRow(name='Listeners',
-                                      action=Action.LISTENERS,
-                                      pattern=MenuPattern.LISTENERS),
-                       CustomTableRow(name='Subscriptions',
-                                      action=Action.SUBSCRIPTIONS,
-                                      pattern=MenuPattern.SUBSCRIPTIONS),
-                       CustomTableRow(name='Private roles',
-                                      action=Action.ROLES,
-                                      pattern=MenuPattern.ROLES),
-                       ),
+                items=_MAIN_MENU_ITEMS,
                 additional_buttons=Button.CLOSE,
             )
             chat_data['menupage'] = menupage
             markup = menupage.markup
             try:
-                await kwargs['message'].edit_text(menupage.name, reply_markup=markup)
+                await ctx.message.edit_text(menupage.name, reply_markup=markup)
             except BadRequest:
-                await context.bot.send_message(kwargs['chat'].id, menupage.name, reply_markup=markup)
+                await context.bot.send_message(ctx.chat.id, menupage.name, reply_markup=markup)
             return
         return await self.__menu_commons(update, context)
 
@@ -327,11 +367,11 @@ class BugSignalService:
     # Inline listeners menu
     @checkvars
     @allowed_for(UserRole.MASTER | UserRole.MODERATOR | UserRole.DEVELOPER, chat_admin=False)
-    async def listeners_menu(self, update: Update, context: CCT, **kwargs: Unpack[ValidatedContext]):
+    async def listeners_menu(self, update: Update, context: CCT, ctx: ValidatedContext):
         """ Handle LISTENERS menu callback """
-        if (menupage := kwargs['chat_data'].get('menupage')) is None:
+        if (menupage := ctx.chat_data.get('menupage')) is None:
             raise MenuError(Notification.ERROR_MENU_PAGE)
-        content = menupage.content(kwargs['callback_data'])
+        content = menupage.content(ctx.callback_data)
         # match inline query callback
         match content:
             # prepare existing Listeners list
@@ -345,13 +385,13 @@ class BugSignalService:
                     additional_buttons=Button.NAVIGATION | Button.BACK | Button.CLOSE,
                     previous=menupage,
                 )
-                kwargs['chat_data']['menupage'] = menupage
+                ctx.chat_data['menupage'] = menupage
             # switch Listener active state
             case {CallbackKey.ACTION: Action.SWITCH,
                   CallbackKey.LISTENER_ID: int(listener_id),
-                  CallbackKey.ACTIVE: bool() | None as active}:
+                  CallbackKey.ACTIVE: bool() | None}:
                 self.logger.debug('Enable/disable LISTENER')
-                self.db.set_listener(listener_id, active=not active)
+                self.db.toggle_listener(listener_id)
                 menupage.items = self.db.listeners()
             case _:
                 return await self.__menu_commons(update, context)
@@ -362,11 +402,11 @@ class BugSignalService:
     # Inline chats menu
     @checkvars
     @allowed_for(UserRole.MASTER | UserRole.MODERATOR | UserRole.DEVELOPER, chat_admin=False)
-    async def chats_menu(self, update: Update, context: CCT, **kwargs: Unpack[ValidatedContext]):
+    async def chats_menu(self, update: Update, context: CCT, ctx: ValidatedContext):
         """ Handle CHATS menu callback """
-        if (menupage := kwargs['chat_data'].get('menupage')) is None:
+        if (menupage := ctx.chat_data.get('menupage')) is None:
             raise MenuError(Notification.ERROR_MENU_PAGE)
-        content = menupage.content(kwargs['callback_data'])
+        content = menupage.content(ctx.callback_data)
         # match inline query callback
         match content:
             # prepare existing Chats list
@@ -374,19 +414,20 @@ class BugSignalService:
                 menupage = InlineMenuPage(
                     pattern=MenuPattern.CHATS,
                     name='Available chats',
-                    items=self.db.chats(exclude=kwargs['chat'].id),
+                    items=self.db.chats(exclude=ctx.chat.id),
                     items_action=Action.SWITCH,
                     checkmark=True,
                     additional_buttons=Button.NAVIGATION | Button.BACK | Button.CLOSE,
                     previous=menupage,
                 )
-                kwargs['chat_data']['menupage'] = menupage
+                ctx.chat_data['menupage'] = menupage
             # switch Chat active state
             case {CallbackKey.ACTION: Action.SWITCH,
                   CallbackKey.CHAT_ID: int(chat_id),
-                  CallbackKey.ACTIVE: bool() | None as active}:
+                  CallbackKey.ACTIVE: bool() | None}:
                 self.logger.debug('Enable/disable LISTENER')
-                self.db.set_chat(chat_id, active=not active)
+                self.db.toggle_chat(chat_id)
+                self.__private_users = None
                 menupage.items = self.db.chats()
             case _:
                 return await self.__menu_commons(update, context)
@@ -397,18 +438,18 @@ class BugSignalService:
     # Inline subscriptions menu
     @checkvars
     @allowed_for(UserRole.MASTER | UserRole.MODERATOR | UserRole.DEVELOPER, chat_admin=True)
-    async def subscriptions_menu(self, update: Update, context: CCT, **kwargs: Unpack[ValidatedContext]):
+    async def subscriptions_menu(self, update: Update, context: CCT, ctx: ValidatedContext):
         """ Handle SUBSCRIPTIONS menu callback """
-        if (menupage := kwargs['chat_data'].get('menupage')) is None:
+        if (menupage := ctx.chat_data.get('menupage')) is None:
             raise MenuError(Notification.ERROR_MENU_PAGE)
         # restricting subscription editing for group chats
-        if kwargs['chat'].type == ChatType.PRIVATE:
+        if ctx.chat.type == ChatType.PRIVATE:
             available_chats = self.db.chats(active_only=True)
-        elif (_current_chat := self.db.chat(kwargs['chat'].id)) is not None:
+        elif (_current_chat := self.db.chat(ctx.chat.id)) is not None:
             available_chats = (_current_chat,)
         else:
             raise MenuError('Chat is undefined')
-        content = menupage.content(kwargs['callback_data'])
+        content = menupage.content(ctx.callback_data)
         # match inline query callback
         match content:
             # prepare active chats list for subscription managing
@@ -421,7 +462,7 @@ class BugSignalService:
                     additional_buttons=Button.NAVIGATION | Button.BACK | Button.CLOSE,
                     previous=menupage,
                 )
-                kwargs['chat_data']['menupage'] = menupage
+                ctx.chat_data['menupage'] = menupage
             # prepare listeners list for chat with checked subscriptions
             case {CallbackKey.ACTION: Action.LISTENERS,
                   CallbackKey.CHAT_ID: int(chat_id)}:
@@ -435,15 +476,15 @@ class BugSignalService:
                     additional_buttons=Button.NAVIGATION | Button.BACK | Button.CLOSE,
                     previous=menupage,
                 )
-                kwargs['chat_data']['menupage'] = menupage
+                ctx.chat_data['menupage'] = menupage
             # insert/update Subscription
             case {CallbackKey.ACTION: Action.SWITCH,
                   CallbackKey.CHAT_ID: int(chat_id),
                   CallbackKey.LISTENER_ID: int(listener_id),
-                  CallbackKey.ACTIVE: bool() | None as active}:
+                  CallbackKey.ACTIVE: bool() | None}:
                 # insert/update Subscription
                 self.logger.debug('Insert/update SUBSCRIPTION')
-                self.db.set_subscription(chat_id, listener_id, active=not active)
+                self.db.toggle_subscription(chat_id, listener_id)
                 _, menupage.items = self.db.subscriptions(chat_id)
             case _:
                 return await self.__menu_commons(update, context)
@@ -453,11 +494,11 @@ class BugSignalService:
     # Inline roles menu
     @checkvars
     @allowed_for(UserRole.MASTER | UserRole.DEVELOPER, chat_admin=False)
-    async def roles_menu(self, update: Update, context: CCT, **kwargs: Unpack[ValidatedContext]):
+    async def roles_menu(self, update: Update, context: CCT, ctx: ValidatedContext):
         """ Handle ROLES menu callback """
-        if (menupage := kwargs['chat_data'].get('menupage')) is None:
+        if (menupage := ctx.chat_data.get('menupage')) is None:
             raise MenuError(Notification.ERROR_MENU_PAGE)
-        content = menupage.content(kwargs['callback_data'])
+        content = menupage.content(ctx.callback_data)
         # match inline query callback
         match content:
             # prepare private chats list
@@ -468,12 +509,12 @@ class BugSignalService:
                     name='Available private chats',
                     items=self.db.chats(active_only=True,
                                         of_types=ChatType.PRIVATE,
-                                        exclude=kwargs['chat'].id),
+                                        exclude=ctx.chat.id),
                     items_action=Action.CHATS,
                     additional_buttons=Button.NAVIGATION | Button.BACK | Button.CLOSE,
                     previous=menupage
                 )
-                kwargs['chat_data']['menupage'] = menupage
+                ctx.chat_data['menupage'] = menupage
             # prepare roles list for chat
             case {CallbackKey.ACTION: Action.CHATS,
                   CallbackKey.CHAT_ID: int(chat_id)}:
@@ -487,7 +528,7 @@ class BugSignalService:
                     additional_buttons=Button.NAVIGATION | Button.BACK | Button.CLOSE,
                     previous=menupage,
                 )
-                kwargs['chat_data']['menupage'] = menupage
+                ctx.chat_data['menupage'] = menupage
             # switch role state
             case {CallbackKey.ACTION: Action.SWITCH,
                   CallbackKey.CHAT_ID: int(chat_id),
@@ -495,6 +536,9 @@ class BugSignalService:
                 # update role
                 self.logger.debug('Add/remove PRIVATE role')
                 self.db.set_chat(chat_id, role=role)
+                self._role_cache.pop(chat_id, None)
+                # role edits may grant or revoke DEVELOPER: refresh the notify list now
+                self.__developers = tuple(self.db.developers())
                 _, menupage.items = self.db.roles(chat_id)
             case _:
                 return await self.__menu_commons(update, context)
@@ -505,42 +549,38 @@ class BugSignalService:
     # shutdown approve menu
     @checkvars
     @allowed_for(UserRole.MASTER | UserRole.DEVELOPER, chat_admin=False)
-    async def shutdown(self, update: Update, context: CCT, **kwargs: Unpack[ValidatedContext]):
+    async def shutdown(self, update: Update, context: CCT, ctx: ValidatedContext):
         """ Open shutdown confirmation """
-        chat_data = kwargs['chat_data']
+        chat_data = ctx.chat_data
         if (menupage := chat_data.get('menupage')) is None:
-            if kwargs['callback_data']:
+            if ctx.callback_data:
                 raise MenuError(Notification.ERROR_MENU_PAGE)
             # build confirmation menu
             menupage = InlineMenuPage(
                 pattern=MenuPattern.SHUTDOWN,
                 name=Notification.MESSAGE_SHUTDOWN_CONFIRM,
-                items=(CustomTableRow(name=f'{Emoji.ENABLED} Yes',
-                                      action=Action.CONFIRM),
-                       CustomTableRow(name=f'{Emoji.DISABLED} No',
-                                      action=Action.CLOSE),
-                      ),
+                items=_SHUTDOWN_MENU_ITEMS,
             )
             chat_data['menupage'] = menupage
             markup = menupage.markup
             try:
-                await kwargs['message'].edit_text(menupage.name,
+                await ctx.message.edit_text(menupage.name,
                                                   parse_mode='HTML',
                                                   reply_markup=markup)
             except BadRequest:
-                await context.bot.send_message(kwargs['chat'].id, menupage.name,
+                await context.bot.send_message(ctx.chat.id, menupage.name,
                                                parse_mode='HTML',
                                                reply_markup=markup)
             return
         else:
-            content = menupage.content(kwargs['callback_data'])
+            content = menupage.content(ctx.callback_data)
             # match inline query callback
             match content:
                 # schedule shutdown job
                 case {CallbackKey.ACTION: Action.CONFIRM}:
-                    self.logger.info(Notification.LOG_SHUTDOWN, kwargs['user'].name, kwargs['user'].id)
-                    await kwargs['message'].edit_text(Notification.MESSAGE_SHUTDOWN, reply_markup=None)
-                    kwargs['job_queue'].run_once(self._onclose,
+                    self.logger.info(Notification.LOG_SHUTDOWN, ctx.user.name, ctx.user.id)
+                    await ctx.message.edit_text(Notification.MESSAGE_SHUTDOWN, reply_markup=None)
+                    ctx.job_queue.run_once(self._onclose,
                                                  when=self.config['timeout']['close'],
                                                  job_kwargs=MISFIRE_GRACE)
                 # close menu
@@ -552,11 +592,13 @@ class BugSignalService:
     # event handlers
     async def _onerror(self, update: object, context: CCT):
         """ Error handler """
+        # cold-path import: only the error handler matches on SQLAlchemy exceptions
+        import sqlalchemy.exc as sqlex
         error = context.error
         while error is not None:
             self.logger.error(Notification.ERROR_TRACEBACK, *self.__exception_args(error))
             error = error.__cause__
-        tasks = ()
+        coros = ()
         match context.error:
             # drop menu inline
             case MenuError() if isinstance(update, Update) and update.effective_message is not None:
@@ -568,28 +610,25 @@ class BugSignalService:
                 *args, caller_chat_id = context.error.args
                 message = Notification.MESSAGE_CHECK_FAILED % (*args,)
                 subscribers = {*self.__developers, caller_chat_id} if caller_chat_id is not None else self.__developers
-                tasks = tuple(
-                    asyncio.create_task(self.__send_messages(context.bot, chat_id, (message,)))
-                    for chat_id in subscribers
-                )
+                coros = tuple(self.__send_messages(context.bot, chat_id, (message,))
+                              for chat_id in subscribers)
             # SQL error
             case sqlex.DBAPIError():
-                tasks = tuple(
-                    asyncio.create_task(self.__send_messages(context.bot,
-                                                             chat_id,
-                                                             (Notification.MESSAGE_SOMETHING_WRONG,)))
-                    for chat_id in self.__developers
-                )
+                coros = tuple(self.__send_messages(context.bot,
+                                                   chat_id,
+                                                   (Notification.MESSAGE_SOMETHING_WRONG,))
+                              for chat_id in self.__developers)
             # # http error
             # case httpx.NetworkError():
             #     ...
             # unhandled error
             case _:
                 ...
-        # await for tasks
-        if tasks:
+        # fan the notifications out in one gather: no Task object per recipient
+        if coros:
             try:
-                await asyncio.wait(tasks, timeout=self.config['timeout']['common'])
+                await asyncio.wait_for(asyncio.gather(*coros, return_exceptions=True),
+                                       timeout=self.config['timeout']['common'])
             except Exception as ex:
                 self.logger.error(Notification.ERROR_TRACEBACK, *self.__exception_args(ex))
 
@@ -597,21 +636,21 @@ class BugSignalService:
         """ On start event """
         await self.__actualize(context)
         # collect developers
-        self.__developers = tuple(
-            chat.chat_id for chat in self.db.chats(active_only=True, of_types=ChatType.PRIVATE)
-            if UserRole.DEVELOPER in UserRole(chat.role)
-        )
+        self.__developers = tuple(self.db.developers())
 
     async def _onclose(self, context: CCT):
         """ On shutdown event """
         if context.job_queue is not None:
             context.job_queue.scheduler.remove_all_jobs()
-        os.kill(os.getpid(), signal.SIGTERM)
+        # in-process stop: run_polling unwinds and shuts down cleanly,
+        # with no kernel signal delivery racing the job removal above
+        context.application.stop_running()
 
     # --------------------------------------------------------------------------------
     # private methods
     def __exception_args(self, ex: Exception | BaseException | None) -> tuple[str, str, str]:
         """ Collect exception info for logging """
+        import traceback
         return (
             'UnknownException' if ex is None else ex.__class__.__name__,
             str(ex),
@@ -620,9 +659,11 @@ class BugSignalService:
 
     def __get_random_user(self, args: Sequence[str] | None, exclude_user: int) -> int:
         """ Get random private user """
-        chats = self.db.chats(active_only=True, of_types=ChatType.PRIVATE)
-        privates = tuple(chat.chat_id for chat in chats
-                         if chat.chat_id != exclude_user)
+        if (chats := self.__private_users) is None:
+            chats = self.__private_users = tuple(
+                chat.chat_id for chat in self.db.chats(active_only=True, of_types=ChatType.PRIVATE))
+        privates = tuple(chat_id for chat_id in chats
+                         if chat_id != exclude_user)
         try:
             if not args:
                 raise ValueError('No destination chat set')
@@ -637,11 +678,15 @@ class BugSignalService:
         """ Send messages to chat by parts """
         LENGTH = 4096   # max telegram message length
         for message in messages:
-            for bound in range(0, len(message), LENGTH):
-                part = message[bound:bound + LENGTH]
-                started = time.monotonic()
+            # almost every notification fits one message: skip slicing entirely then,
+            # otherwise chunk once up front so retries resend the same immutable part
+            parts = ((message,) if len(message) <= LENGTH
+                     else tuple(message[bound:bound + LENGTH] for bound in range(0, len(message), LENGTH)))
+            for part in parts:
+                # fixed deadline: one clock read and compare per retry
+                deadline = time.monotonic() + self.config['timeout']['lifetime']
                 error = None
-                while time.monotonic() - started <= self.config['timeout']['lifetime']:
+                while time.monotonic() <= deadline:
                     try:
                         await bot.send_message(chat_id, part)
                         self.logger.info(Notification.LOG_MESSAGE_SENT, chat_id)
@@ -656,9 +701,9 @@ class BugSignalService:
     async def __actualize(self, context: CCT):
         """ Actualize listeners """
         assert (job_queue := context.job_queue) is not None, '[__actualize] job_queue is None'
-        # get listeners info from database
+        # get listeners info from database [off the loop thread: runs on a schedule, not a user action]
         try:
-            listeners = self.db.listeners(active_only=True)
+            listeners = await asyncio.to_thread(self.db.listeners, True)
         except:
             _next_t = self.config['timeout']['retryInterval']
             raise
@@ -712,6 +757,13 @@ class BugSignalService:
                                          name=JobName.LISTENER,
                                          job_kwargs=MISFIRE_GRACE)
                 self.logger.info(Notification.LOG_JOB_SCHEDULED, job.name, listener.name, listener.id, job.next_t)
+        # close dropped instances: stops filesystem observers and releases shared
+        # engines; close() is idempotent, so inherited listeners are fine here too
+        for listener_id, dropped in __listeners.items():
+            if self.__listeners.get(listener_id) is not dropped:
+                dropped.close()
+            if listener_id not in self.__listeners:
+                self.__listener_locks.pop(listener_id, None)
 
     async def __check_listener(self, context: CCT):
         """ Check for listener updates and send notifications """
@@ -723,10 +775,15 @@ class BugSignalService:
         # start checking
         self.logger.debug(Notification.LOG_CHECK_LISTENER, listener.name, listener.id, listener.updated)
         try:
-            if messages := listener.check():
-                subscribers = self.db.subscribers(listener.id, active_only=True)
-            else:
-                subscribers = ()
+            # the per-listener lock is taken before a semaphore slot so an
+            # already-running check doesn't hold up unrelated listeners
+            async with self.__listener_locks.setdefault(listener.id, asyncio.Lock()), self.__check_bound:
+                # run blocking filesystem/SQL work off the event loop thread,
+                # so slow listeners overlap instead of serializing every job
+                if messages := await asyncio.to_thread(listener.check):
+                    subscribers = await asyncio.to_thread(self.db.subscribers, listener.id, active_only=True)
+                else:
+                    subscribers = ()
         except Exception as ex:
             raise ListenerCheckError(listener.id, listener.name, context.job.chat_id) from ex
         finally: